@@ -6,6 +6,173 @@ from io import BytesIO
 from groq import Groq
 import streamlit as st
 import os
+import threading
+import time
+from collections import deque
+from urllib.parse import quote_plus
+
+# Upper bound for any single upstream call, so one slow API can't hold up the others
+UPSTREAM_TIMEOUT = aiohttp.ClientTimeout(total=8)
+
+# How long "nothing found" answers are remembered before we ask the upstream again
+NEGATIVE_CACHE_TTL = 300
+
+# Error reasons Google APIs use when a key has run out of quota
+QUOTA_REASONS = {'quotaExceeded', 'dailyLimitExceeded', 'rateLimitExceeded', 'userRateLimitExceeded'}
+
+# Places statuses that say something about the upstream itself rather than the query
+PLACES_UNHEALTHY_STATUSES = ('OVER_QUERY_LIMIT', 'UNKNOWN_ERROR')
+
+# The fetch_* functions below return None instead of a list when the upstream was
+# skipped or is failing, so the caller can tell "nothing found" from "unavailable".
+
+
+class _Ticket:
+    def __init__(self, generation, probe):
+        self.generation = generation
+        self.probe = probe
+        self.done = False
+
+
+class CircuitBreaker:
+    """Tracks recent calls to one upstream and stops calling it while it is unhealthy.
+
+    closed    -> calls go through; outcomes are recorded in a sliding window
+    open      -> calls are skipped until the cooldown has passed
+    half_open -> a single probe call is let through to decide whether to close again
+
+    allow_request() hands out a ticket (or None when the call should be skipped).
+    Every ticket must end in record_success, record_failure or release. Outcomes
+    from tickets issued before the last state change are ignored.
+    """
+
+    def __init__(self, name, window_size=10, min_calls=5, failure_rate=0.5,
+                 slow_call_seconds=5.0, cooldown_seconds=60.0):
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self._outcomes = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._generation = 0
+        self._probe = None
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "closed":
+                return _Ticket(self._generation, probe=False)
+            if self.state == "open":
+                if now - self._opened_at < self.cooldown_seconds:
+                    return None
+                self._set_state("half_open")
+            # half_open: only one probe at a time, but a probe that never reported
+            # back is given up on after a cooldown so the breaker can't get stuck
+            if self._probe is not None and now - self._probe_started < self.cooldown_seconds:
+                return None
+            self._probe = _Ticket(self._generation, probe=True)
+            self._probe_started = now
+            return self._probe
+
+    def record_success(self, ticket, latency):
+        # A call that answers but takes too long still counts against the upstream
+        if latency > self.slow_call_seconds:
+            self.record_failure(ticket)
+            return
+        with self._lock:
+            if not self._accept(ticket):
+                return
+            if self.state == "half_open":
+                self._set_state("closed")
+            self._outcomes.append(True)
+
+    def record_failure(self, ticket):
+        with self._lock:
+            if not self._accept(ticket):
+                return
+            if self.state == "half_open":
+                self._trip()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) > self.failure_rate:
+                self._trip()
+
+    def release(self, ticket):
+        # Gives back a ticket without an outcome (e.g. the call was cancelled)
+        with self._lock:
+            if ticket.done:
+                return
+            ticket.done = True
+            if ticket is self._probe:
+                self._probe = None
+
+    def _accept(self, ticket):
+        if ticket.done:
+            return False
+        ticket.done = True
+        if ticket.generation != self._generation:
+            return False
+        if self.state == "half_open":
+            return ticket is self._probe
+        return self.state == "closed"
+
+    def _trip(self):
+        self._set_state("open")
+        self._opened_at = time.monotonic()
+
+    def _set_state(self, state):
+        self.state = state
+        self._generation += 1
+        self._probe = None
+        self._outcomes.clear()
+
+
+# One breaker per upstream; module state survives Streamlit reruns within the process
+BREAKERS = {
+    'youtube': CircuitBreaker('youtube'),
+    'custom_search': CircuitBreaker('custom_search'),
+    'places': CircuitBreaker('places'),
+}
+
+_negative_cache = {}
+_negative_cache_lock = threading.Lock()
+
+def _is_cached_negative(upstream, query):
+    key = (upstream, query.strip().lower())
+    with _negative_cache_lock:
+        expires_at = _negative_cache.get(key)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del _negative_cache[key]
+            return False
+        return True
+
+def _cache_negative(upstream, query):
+    key = (upstream, query.strip().lower())
+    now = time.monotonic()
+    with _negative_cache_lock:
+        for stale_key in [k for k, expires_at in _negative_cache.items() if expires_at < now]:
+            del _negative_cache[stale_key]
+        _negative_cache[key] = now + NEGATIVE_CACHE_TTL
+
+def _is_upstream_failure(error):
+    # Quota, rate limiting and server errors; bad requests say nothing about upstream health
+    code = error.get('code') or 0
+    reasons = {e.get('reason') for e in error.get('errors', [])}
+    return code == 429 or code >= 500 or bool(reasons & QUOTA_REASONS)
+
+async def _get_json(session, url):
+    async with session.get(url) as response:
+        if response.status >= 500:
+            response.raise_for_status()
+        return await response.json(content_type=None)
 
 # Initialize the Groq LLM
 def get_llm(api_key):
@@ -30,26 +197,47 @@ def get_recipe(llm, dish_name):
         return f"Error fetching recipe: {e}"
 
 async def fetch_youtube_links(dish_name, youtube_api_key):
+    if _is_cached_negative('youtube', dish_name):
+        return []
+    breaker = BREAKERS['youtube']
+    ticket = breaker.allow_request()
+    if ticket is None:
+        return None
+    started = time.monotonic()
     try:
-        search_url = f"https://www.googleapis.com/youtube/v3/search?part=snippet&q={dish_name} recipe&key={youtube_api_key}&maxResults=6&type=video"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(search_url) as response:
-                response_data = await response.json()
+        search_url = f"https://www.googleapis.com/youtube/v3/search?part=snippet&q={quote_plus(dish_name + ' recipe')}&key={youtube_api_key}&maxResults=6&type=video"
+        async with aiohttp.ClientSession(timeout=UPSTREAM_TIMEOUT) as session:
+            response_data = await _get_json(session, search_url)
         
-        if 'items' in response_data and response_data['items']:
-            video_links = []
-            for item in response_data['items']:
-                video_id = item['id']['videoId']
-                title = item['snippet']['title']
-                thumbnail = item['snippet']['thumbnails']['medium']['url']
-                video_url = f"https://www.youtube.com/watch?v={video_id}"
-                video_links.append({'title': title, 'url': video_url, 'thumbnail': thumbnail})
-            return video_links
-        else:
+        # Quota exhaustion and key problems come back as an 'error' object
+        if 'error' in response_data:
+            print(f"YouTube API error: {response_data['error'].get('message')}")
+            if _is_upstream_failure(response_data['error']):
+                breaker.record_failure(ticket)
+                return None
             return []
+        
+        video_links = []
+        for item in response_data.get('items', []):
+            video_id = item['id']['videoId']
+            title = item['snippet']['title']
+            thumbnail = item['snippet']['thumbnails']['medium']['url']
+            video_url = f"https://www.youtube.com/watch?v={video_id}"
+            video_links.append({'title': title, 'url': video_url, 'thumbnail': thumbnail})
+        breaker.record_success(ticket, time.monotonic() - started)
+        
+        if not video_links:
+            _cache_negative('youtube', dish_name)
+        return video_links
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        breaker.record_failure(ticket)
+        print(f"Error fetching YouTube links: {e}")
+        return None
     except Exception as e:
         print(f"Error fetching YouTube links: {e}")
         return []
+    finally:
+        breaker.release(ticket)
 
 async def fetch_image(session, url):
     try:
@@ -64,39 +252,74 @@ async def fetch_image(session, url):
     return None
 
 async def fetch_images(dish_name, google_api_key, search_engine_id):
+    if _is_cached_negative('custom_search', dish_name):
+        return []
+    breaker = BREAKERS['custom_search']
+    ticket = breaker.allow_request()
+    if ticket is None:
+        return None
+    started = time.monotonic()
     try:
         # Using Google Custom Search API
-        search_url = f"https://www.googleapis.com/customsearch/v1?q={dish_name} recipe food&searchType=image&key={google_api_key}&cx={search_engine_id}&num=10"
+        search_url = f"https://www.googleapis.com/customsearch/v1?q={quote_plus(dish_name + ' recipe food')}&searchType=image&key={google_api_key}&cx={search_engine_id}&num=10"
+        
+        async with aiohttp.ClientSession(timeout=UPSTREAM_TIMEOUT) as session:
+            response_data = await _get_json(session, search_url)
+        
+        if 'error' in response_data:
+            print(f"Custom Search API error: {response_data['error'].get('message')}")
+            if _is_upstream_failure(response_data['error']):
+                breaker.record_failure(ticket)
+                return None
+            return []
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(search_url) as response:
-                response_data = await response.json()
+        image_urls = [item['link'] for item in response_data.get('items', [])]
+        breaker.record_success(ticket, time.monotonic() - started)
         
         images = []
-        if 'items' in response_data:
-            image_urls = [item['link'] for item in response_data['items']]
-            
+        if image_urls:
             async with aiohttp.ClientSession() as session:
                 tasks = [fetch_image(session, url) for url in image_urls]
                 results = await asyncio.gather(*tasks)
                 images = [img for img in results if img is not None]
-                
-        return images[:8] # Return top 8 images for a nice grid
+        else:
+            _cache_negative('custom_search', dish_name)
         
+        return images[:8] # Return top 8 images for a nice grid
+    
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        breaker.record_failure(ticket)
+        print(f"Error fetching images: {e}")
+        return None
     except Exception as e:
         print(f"Error fetching images: {e}")
         return []
+    finally:
+        breaker.release(ticket)
 
 async def fetch_locations(dish_name, google_places_api_key):
+    if not google_places_api_key:
+        st.error("Google Places API key is not configured. Please set GOOGLE_PLACES_API_KEY in your .env file.")
+        return []
+    
+    if _is_cached_negative('places', dish_name):
+        st.warning(f"No restaurants found for '{dish_name}'")
+        return []
+    breaker = BREAKERS['places']
+    ticket = breaker.allow_request()
+    if ticket is None:
+        return None
+    started = time.monotonic()
     try:
-        if not google_places_api_key:
-            st.error("Google Places API key is not configured. Please set GOOGLE_PLACES_API_KEY in your .env file.")
-            return []
-            
-        places_url = f"https://maps.googleapis.com/maps/api/place/textsearch/json?query={dish_name} restaurant&key={google_places_api_key}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(places_url) as response:
-                places_data = await response.json()
+        places_url = f"https://maps.googleapis.com/maps/api/place/textsearch/json?query={quote_plus(dish_name + ' restaurant')}&key={google_places_api_key}"
+        async with aiohttp.ClientSession(timeout=UPSTREAM_TIMEOUT) as session:
+            places_data = await _get_json(session, places_url)
+        
+        status = places_data.get('status')
+        if status in PLACES_UNHEALTHY_STATUSES:
+            breaker.record_failure(ticket)
+            print(f"Google Places API returned status: {status}")
+            return None
         
         locations = []
         if 'results' in places_data and places_data['results']:
@@ -109,12 +332,21 @@ async def fetch_locations(dish_name, google_places_api_key):
                 })
         elif 'error_message' in places_data:
             st.error(f"Google Maps API Error: {places_data['error_message']}")
-        elif places_data.get('status') == 'ZERO_RESULTS':
+        elif status == 'ZERO_RESULTS':
+            _cache_negative('places', dish_name)
             st.warning(f"No restaurants found for '{dish_name}'")
-        elif places_data.get('status') != 'OK':
-            st.error(f"Google Places API returned status: {places_data.get('status')}")
+        elif status != 'OK':
+            st.error(f"Google Places API returned status: {status}")
         
+        if status in ('OK', 'ZERO_RESULTS'):
+            breaker.record_success(ticket, time.monotonic() - started)
         return locations
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        breaker.record_failure(ticket)
+        print(f"Error fetching locations: {e}")
+        return None
     except Exception as e:
         st.error(f"Error fetching locations: {e}")
         return []
+    finally:
+        breaker.release(ticket)
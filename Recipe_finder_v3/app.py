@@ -43,6 +43,8 @@ if 'has_searched' not in st.session_state:
     st.session_state.has_searched = False
 if 'searched_dish' not in st.session_state:
     st.session_state.searched_dish = ""
+if 'unavailable' not in st.session_state:
+    st.session_state.unavailable = []
 
 def reset_app():
     st.session_state.recipe = ""
@@ -51,6 +53,10 @@ def reset_app():
     st.session_state.locations = []
     st.session_state.has_searched = False
     st.session_state.searched_dish = ""
+    st.session_state.unavailable = []
+
+def show_unavailable_notice(section):
+    st.warning(f"{section} is temporarily unavailable. Please try again in a minute.")
 
 # Header
 st.markdown("<h1>🍳 Gourmet AI <br><span style='font-size: 1.5rem; color: #666; font-weight: 400;'>Your Personal Culinary Assistant</span></h1>", unsafe_allow_html=True)
@@ -103,8 +109,13 @@ if find_recipe_btn or (current_dish and not st.session_state.has_searched and no
 
             results = asyncio.run(fetch_all_data())
             st.session_state.recipe = results[0]
-            st.session_state.images = results[1]
-            st.session_state.youtube_links = results[2]
+            # None means the upstream was skipped or failing, as opposed to having no results
+            st.session_state.images = results[1] or []
+            st.session_state.youtube_links = results[2] or []
+            st.session_state.unavailable = [
+                section for section, result in (("Image search", results[1]), ("YouTube", results[2]))
+                if result is None
+            ]
             
             # Clear the URL query param so search box is ready for new search
             st.query_params.clear()
@@ -121,7 +132,9 @@ if find_places_btn:
         with st.spinner(f"Scouting for {dish_for_restaurants} nearby..."):
             st.session_state.searched_dish = dish_for_restaurants
             locations_result = asyncio.run(fetch_locations(dish_for_restaurants, GOOGLE_PLACES_API_KEY))
-            st.session_state.locations = locations_result
+            st.session_state.locations = locations_result or []
+            if locations_result is None:
+                show_unavailable_notice("Restaurant search")
             
             # Clear the URL query param so search box is ready for new search
             st.query_params.clear()
@@ -135,6 +148,9 @@ if find_places_btn:
 # Display Results
 if st.session_state.has_searched or st.session_state.locations:
     
+    for section in st.session_state.unavailable:
+        show_unavailable_notice(section)
+    
     # Layout: Recipe on Left, Visuals on Right
     content_col1, content_col2 = st.columns([3, 2])
     
@@ -0,0 +1,261 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+import api_services
+from api_services import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(api_services.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(api_services, "BREAKERS", {
+        'youtube': CircuitBreaker('youtube'),
+        'custom_search': CircuitBreaker('custom_search'),
+        'places': CircuitBreaker('places'),
+    })
+    monkeypatch.setattr(api_services, "_negative_cache", {})
+
+
+def stub_get_json(monkeypatch, responses):
+    """Make _get_json return (or raise) the given items in order and record requested URLs."""
+    urls = []
+
+    async def fake_get_json(session, url):
+        urls.append(url)
+        result = responses.pop(0)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    monkeypatch.setattr(api_services, "_get_json", fake_get_json)
+    return urls
+
+
+def fail(breaker, times):
+    for _ in range(times):
+        breaker.record_failure(breaker.allow_request())
+
+
+def succeed(breaker, times):
+    for _ in range(times):
+        breaker.record_success(breaker.allow_request(), 0.1)
+
+
+def trip(breaker):
+    fail(breaker, breaker.min_calls)
+    assert breaker.state == "open"
+
+
+# --- CircuitBreaker -------------------------------------------------------
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = CircuitBreaker('test')
+    fail(breaker, 4)
+    assert breaker.state == "closed"
+
+
+def test_does_not_trip_at_exactly_failure_rate(clock):
+    breaker = CircuitBreaker('test')
+    succeed(breaker, 3)
+    fail(breaker, 3)
+    assert breaker.state == "closed"
+
+
+def test_trips_above_failure_rate(clock):
+    breaker = CircuitBreaker('test')
+    succeed(breaker, 2)
+    fail(breaker, 3)
+    assert breaker.state == "open"
+    assert breaker.allow_request() is None
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = CircuitBreaker('test')
+    for _ in range(5):
+        breaker.record_success(breaker.allow_request(), breaker.slow_call_seconds + 1)
+    assert breaker.state == "open"
+
+
+def test_half_open_after_cooldown_allows_single_probe(clock):
+    breaker = CircuitBreaker('test')
+    trip(breaker)
+    clock.now += breaker.cooldown_seconds - 1
+    assert breaker.allow_request() is None
+    clock.now += 1
+    probe = breaker.allow_request()
+    assert probe is not None
+    assert breaker.state == "half_open"
+    assert breaker.allow_request() is None
+
+
+def test_probe_success_closes(clock):
+    breaker = CircuitBreaker('test')
+    trip(breaker)
+    clock.now += breaker.cooldown_seconds
+    breaker.record_success(breaker.allow_request(), 0.1)
+    assert breaker.state == "closed"
+    assert breaker.allow_request() is not None
+
+
+def test_probe_failure_reopens_with_fresh_cooldown(clock):
+    breaker = CircuitBreaker('test')
+    trip(breaker)
+    clock.now += breaker.cooldown_seconds
+    breaker.record_failure(breaker.allow_request())
+    assert breaker.state == "open"
+    clock.now += breaker.cooldown_seconds - 1
+    assert breaker.allow_request() is None
+
+
+def test_released_probe_frees_the_slot(clock):
+    breaker = CircuitBreaker('test')
+    trip(breaker)
+    clock.now += breaker.cooldown_seconds
+    breaker.release(breaker.allow_request())
+    assert breaker.state == "half_open"
+    assert breaker.allow_request() is not None
+
+
+def test_stale_probe_expires(clock):
+    breaker = CircuitBreaker('test')
+    trip(breaker)
+    clock.now += breaker.cooldown_seconds
+    assert breaker.allow_request() is not None
+    clock.now += breaker.cooldown_seconds
+    assert breaker.allow_request() is not None
+
+
+def test_late_failure_while_open_does_not_extend_cooldown(clock):
+    breaker = CircuitBreaker('test')
+    late = breaker.allow_request()
+    trip(breaker)
+    clock.now += breaker.cooldown_seconds - 1
+    breaker.record_failure(late)
+    clock.now += 1
+    assert breaker.allow_request() is not None
+
+
+def test_late_success_during_half_open_is_ignored(clock):
+    breaker = CircuitBreaker('test')
+    late = breaker.allow_request()
+    trip(breaker)
+    clock.now += breaker.cooldown_seconds
+    probe = breaker.allow_request()
+    breaker.record_success(late, 0.1)
+    assert breaker.state == "half_open"
+    breaker.record_success(probe, 0.1)
+    assert breaker.state == "closed"
+
+
+def test_ticket_outcome_is_counted_once(clock):
+    breaker = CircuitBreaker('test')
+    ticket = breaker.allow_request()
+    breaker.record_success(ticket, 0.1)
+    breaker.record_failure(ticket)
+    assert list(breaker._outcomes) == [True]
+
+
+# --- Negative cache -------------------------------------------------------
+
+def test_negative_cache_expires(clock):
+    api_services._cache_negative('youtube', 'Sushi')
+    assert api_services._is_cached_negative('youtube', ' sushi ')
+    clock.now += api_services.NEGATIVE_CACHE_TTL + 1
+    assert not api_services._is_cached_negative('youtube', 'sushi')
+
+
+def test_negative_cache_prunes_expired_entries(clock):
+    api_services._cache_negative('youtube', 'old dish')
+    clock.now += api_services.NEGATIVE_CACHE_TTL + 1
+    api_services._cache_negative('youtube', 'new dish')
+    assert list(api_services._negative_cache) == [('youtube', 'new dish')]
+
+
+# --- Fetch functions ------------------------------------------------------
+
+def test_empty_youtube_result_is_cached(clock, monkeypatch):
+    urls = stub_get_json(monkeypatch, [{'items': []}])
+    assert asyncio.run(api_services.fetch_youtube_links('Mac & Cheese', 'key')) == []
+    assert asyncio.run(api_services.fetch_youtube_links('Mac & Cheese', 'key')) == []
+    assert len(urls) == 1
+    assert 'q=Mac+%26+Cheese+recipe&' in urls[0]
+
+
+def test_quota_error_counts_and_reports_unavailable(clock, monkeypatch):
+    quota = {'error': {'code': 403, 'message': 'quota', 'errors': [{'reason': 'quotaExceeded'}]}}
+    stub_get_json(monkeypatch, [quota] * 5)
+    for _ in range(5):
+        assert asyncio.run(api_services.fetch_youtube_links('Sushi', 'key')) is None
+    assert api_services.BREAKERS['youtube'].state == "open"
+
+
+def test_bad_request_does_not_count_against_upstream(clock, monkeypatch):
+    bad_request = {'error': {'code': 400, 'message': 'bad', 'errors': [{'reason': 'badRequest'}]}}
+    stub_get_json(monkeypatch, [bad_request] * 5)
+    for _ in range(5):
+        assert asyncio.run(api_services.fetch_images('Sushi', 'key', 'cx')) == []
+    assert api_services.BREAKERS['custom_search'].state == "closed"
+
+
+def test_open_breaker_skips_upstream(clock, monkeypatch):
+    urls = stub_get_json(monkeypatch, [])
+    trip(api_services.BREAKERS['custom_search'])
+    assert asyncio.run(api_services.fetch_images('Sushi', 'key', 'cx')) is None
+    assert urls == []
+
+
+def test_unparseable_item_is_not_double_counted(clock, monkeypatch):
+    stub_get_json(monkeypatch, [{'items': [{'id': {}}]}])
+    assert asyncio.run(api_services.fetch_youtube_links('Sushi', 'key')) == []
+    assert list(api_services.BREAKERS['youtube']._outcomes) == []
+
+
+def test_transport_error_counts_as_failure(clock, monkeypatch):
+    stub_get_json(monkeypatch, [aiohttp.ClientConnectionError()])
+    assert asyncio.run(api_services.fetch_locations('Sushi', 'key')) is None
+    assert list(api_services.BREAKERS['places']._outcomes) == [False]
+
+
+def test_places_zero_results_is_cached(clock, monkeypatch):
+    urls = stub_get_json(monkeypatch, [{'status': 'ZERO_RESULTS', 'results': []}])
+    assert asyncio.run(api_services.fetch_locations('Sushi', 'key')) == []
+    assert asyncio.run(api_services.fetch_locations('Sushi', 'key')) == []
+    assert len(urls) == 1
+
+
+def test_cancelled_probe_does_not_wedge_breaker(clock, monkeypatch):
+    breaker = api_services.BREAKERS['youtube']
+    trip(breaker)
+    clock.now += breaker.cooldown_seconds
+
+    async def hang(session, url):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(api_services, "_get_json", hang)
+
+    async def cancel_probe():
+        task = asyncio.create_task(api_services.fetch_youtube_links('Sushi', 'key'))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert breaker.state == "half_open"
+    assert breaker.allow_request() is not None